@@ -0,0 +1,14 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+# API URL for Rust backend
+API_URL = "http://localhost:3000"
+
+# One keep-alive connection pool to the backend, shared by all pages, reruns and sessions.
+# Auth headers are passed per request, since the session is shared between users.
+SESSION = requests.Session()
+SESSION.mount(API_URL, HTTPAdapter(pool_connections=1, pool_maxsize=16))
+
+
+def auth_headers(token):
+    return {"Authorization": f"Bearer {token}"}
@@ -1,61 +1,184 @@
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 import streamlit as st
 import requests
+from requests_toolbelt import MultipartEncoder
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from api_client import API_URL, SESSION, auth_headers
 
-# API URL for Rust backend
-API_URL = "http://localhost:3000"
-headers = {
-    "Authorization": f"Bearer {st.session_state['token']}"
-}
+# Number of files shown per page
+PAGE = 20
 
 # Require login
 if not st.session_state.get("token", False):
     st.warning("Please log in first.")
     st.stop()
 
+headers = auth_headers(st.session_state.token)
+
+# Files the user has asked to download, one by one or a page at a time.
+# Only the ids are kept in the session, the contents live in fetch_file's cache.
+if "prepared" not in st.session_state:
+    st.session_state.prepared = set()
+
 st.title("Document Manager")
 
 
+# Fetch and list files
+
+# Streamlit reruns the whole script on every interaction, so the listing is cached briefly
+@st.cache_data(ttl=30, show_spinner=False)
+def list_files(token):
+    resp = SESSION.get(f"{API_URL}/files", headers=auth_headers(token))
+    resp.raise_for_status()
+    # Normalised to (id, filename) pairs once here, instead of dict lookups on every render
+    return [(file["id"], file["filename"]) for file in orjson.loads(resp.content)]
+
+
 # File upload
 
 uploaded_file = st.file_uploader("Upload a file")
 
 if uploaded_file:
     if st.button("Upload"):
-        files = {
+        # Stream the upload straight from the file object instead of copying it into memory first
+        uploaded_file.seek(0)
+        encoder = MultipartEncoder(fields={
             'file': (uploaded_file.name,
-                     uploaded_file.getvalue(),
+                     uploaded_file,
                      uploaded_file.type)
-        }
-        response = requests.post(f"{API_URL}/upload", files=files, headers=headers)
+        })
+        response = SESSION.post(
+            f"{API_URL}/upload",
+            data=encoder,
+            headers={**headers, "Content-Type": encoder.content_type}
+        )
         if response.status_code == 200:
             st.success("File uploaded successfully.")
+            # Drop the cached listing so the new file shows up right away
+            list_files.clear()
         else:
             st.error(f"Upload failed: {response.status_code}")
 
 
-# Fetch and list files
+# File contents never change for an id, so repeat reruns are served from a bounded cache.
+# _content is not part of the cache key, it lets a batch download fill the cache without a request.
+@st.cache_data(max_entries=64, ttl=300, show_spinner=False)
+def fetch_file(file_id, token, _content=None):
+    if _content is not None:
+        return _content
+    # Read the body in one go off the raw stream, instead of letting .content join it from chunks
+    with SESSION.get(f"{API_URL}/download_file/{file_id}", headers=auth_headers(token), stream=True) as file_resp:
+        file_resp.raise_for_status()
+        return file_resp.raw.read(decode_content=True)
+
+
+def fetch_batch(file_ids, token):
+    # A single request for all the files, sent back as one tar archive with an entry per file id
+    with SESSION.get(
+        f"{API_URL}/files/batch",
+        params={"ids": ",".join(file_ids)},
+        headers=auth_headers(token),
+        stream=True
+    ) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        contents = {}
+        with tarfile.open(fileobj=resp.raw, mode="r|") as archive:
+            for member in archive:
+                contents[member.name] = archive.extractfile(member).read()
+        return contents
+
+
+def fetch(file_id, token):
+    try:
+        return 200, fetch_file(file_id, token)
+    except requests.HTTPError as err:
+        return err.response.status_code, None
+
+
+def fetch_all(file_ids):
+    # Threads rather than asyncio, since Streamlit runs the script synchronously.
+    # The downloads share the pooled session, and max_workers caps them at 8 connections at a time.
+    # The workers get the script run context, so fetch_file's cache works from them.
+    ctx = get_script_run_ctx()
+    token = st.session_state.token
+    with ThreadPoolExecutor(max_workers=8,
+                            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as executor:
+        return list(executor.map(lambda file_id: fetch(file_id, token), file_ids))
+
+
+def set_page_start(start):
+    st.session_state.page_start = start
+
+
+# Only this part reruns when its own buttons are clicked, the upload form is left alone.
+# The buttons change state in on_click callbacks, so the rerun their click triggers shows it.
+@st.fragment
+def render_files():
+    st.header("Available Files")
+    try:
+        file_list = list_files(st.session_state.token)
+    except requests.HTTPError as err:
+        st.error(f"Failed to fetch file list: {err.response.status_code}")
+        return
 
-st.header("Available Files")
-resp = requests.get(f"{API_URL}/files", headers=headers)
-if resp.status_code == 200:
-    file_list = resp.json()
     if not file_list:
         st.info("No files found.")
-    for file in file_list:
-        file_id = file["id"]
-        filename = file["filename"]
-        download_url = f"{API_URL}/download_file/{file_id}"  # <- only the ID goes here
 
-        file_resp = requests.get(download_url, headers=headers)
-        if file_resp.status_code == 200:
+    # Only the current page of the listing is rendered and fetched
+    start = st.session_state.get("page_start", 0)
+    if start >= len(file_list):
+        start = 0
+    page = file_list[start:start + PAGE]
+
+    if page and st.button("Prepare all files on this page"):
+        batch = [file_id for file_id, _ in page]
+        try:
+            # Put every file of the archive into fetch_file's cache, so the files are served
+            # from there like ones prepared one by one, and are fetched singly if evicted
+            for file_id, content in fetch_batch(batch, st.session_state.token).items():
+                fetch_file(file_id, st.session_state.token, _content=content)
+            st.session_state.prepared.update(batch)
+        except requests.HTTPError as err:
+            st.error(f"Failed to download files: {err.response.status_code}")
+
+    # Only files the user has asked for are downloaded, the rest just get a prepare button
+    prepared = [file_id for file_id, _ in page if file_id in st.session_state.prepared]
+    contents = {}
+    failed = {}
+    for file_id, (status, content) in zip(prepared, fetch_all(prepared)):
+        if status == 200:
+            contents[file_id] = content
+        else:
+            failed[file_id] = status
+            st.session_state.prepared.discard(file_id)
+
+    for file_id, filename in page:
+        if file_id in failed:
+            st.error(f"Failed to download {filename}: {failed[file_id]}")
+        elif file_id in contents:
             st.download_button(
                 label=f"Download {filename}",
-                data=file_resp.content,
+                data=contents[file_id],
                 file_name=filename,
                 key=f"download_{file_id}"
             )
         else:
-            st.error(f"Failed to download {file}: {file_resp.status_code}")
+            st.button(f"Prepare {filename}", key=f"prepare_{file_id}",
+                      on_click=st.session_state.prepared.add, args=(file_id,))
+
+    if len(file_list) > PAGE:
+        prev_col, info_col, next_col = st.columns(3)
+        prev_col.button("Previous", disabled=start == 0,
+                        on_click=set_page_start, args=(max(start - PAGE, 0),))
+        info_col.write(f"Files {start + 1}-{start + len(page)} of {len(file_list)}")
+        next_col.button("Next", disabled=start + PAGE >= len(file_list),
+                        on_click=set_page_start, args=(start + PAGE,))
+
 
-else:
-    st.error(f"Failed to fetch file list: {resp.status_code}")
+render_files()
@@ -1,5 +1,14 @@
+import gc
+
 import streamlit as st
 
+# The full collection after each rerun is turned off in .streamlit/config.toml (postScriptGC).
+# On top of that, collect generation 0 far less often than the default of 700. Generations 1 and 2
+# keep their defaults, so older cycles are still collected.
+# This changes the GC for the whole process, i.e. every session. start.py runs again on every
+# rerun, so it is re-applied each time with the same value.
+gc.set_threshold(100_000)
+
 
 st.set_page_config(
     page_title="Main",
@@ -12,12 +21,16 @@ st.set_page_config(
 # Now import other Streamlit-dependent modules
 from st_pages import add_page_title, get_nav_from_toml
 
-import os
+from pathlib import Path
+
+PAGES_TOML = Path(__file__).parent / "pages_sections.toml"
 
-currentDir = os.getcwd()
-toml_path = os.path.join(currentDir, "Webapp", "pages_sections.toml")
+# Parse the page config once per session, instead of reading the TOML file on every rerun.
+# It is not shared between sessions, since st.navigation and page.run() mutate the page objects.
+if "nav" not in st.session_state:
+    st.session_state.nav = get_nav_from_toml(str(PAGES_TOML))
 
-nav = get_nav_from_toml("pages_sections.toml")
+nav = st.session_state.nav
 if nav:
     pg = st.navigation(nav)
     add_page_title(pg)
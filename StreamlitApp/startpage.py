@@ -1,8 +1,8 @@
+import orjson
 import streamlit as st
 import requests
 
-# API URL for Rust backend
-API_URL = "http://localhost:3000"
+from api_client import API_URL, SESSION
 
 # Session state for login
 if "token" not in st.session_state:
@@ -10,17 +10,15 @@ if "token" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state.username = ""
 
-# Dummy credentials (just in case backend fails)
-USER_CREDENTIALS = {
-    "admin": "admin123", #Admin credentials
-    
-    "user": "password" #User credentials
-}
-
 def login(username, password):
-    response = requests.post(API_URL+"/login", json={"username": username, "password": password})
+    # The login request doubles as the liveness check, a connection error means the backend is down
+    try:
+        response = SESSION.post(API_URL+"/login", json={"username": username, "password": password}, timeout=5)
+    except (requests.ConnectionError, requests.Timeout):
+        st.error("Could not reach the backend, please try again later.")
+        return False
     if response.status_code == 200:
-        st.session_state.token = response.json().get("token")
+        st.session_state.token = orjson.loads(response.content).get("token")
     else :
         st.error(response.text)
     return response.status_code == 200
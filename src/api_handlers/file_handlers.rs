@@ -4,9 +4,9 @@ use bson::spec::BinarySubtype;
 use mongodb::Collection;
 use poem::{handler, Error, Response, IntoResponse, Request};
 use poem::http::{HeaderValue, StatusCode};
-use poem::web::{Data, Json, Multipart, Path};
-use serde::{Serialize};
-use crate::database::file_db::{get_image_by_filename, insert_image, ImageDocument, insert_document, get_document_by_id, DocumentEntry, get_documents_for_user, FileEntry};
+use poem::web::{Data, Json, Multipart, Path, Query};
+use serde::{Deserialize, Serialize};
+use crate::database::file_db::{get_image_by_filename, insert_image, ImageDocument, insert_document, get_document_by_id, DocumentEntry, get_documents_for_user, FileEntry, get_documents_by_ids};
 use futures_util::stream::TryStreamExt;
 use crate::api_handlers::extract_user;
 
@@ -194,4 +194,65 @@ pub async fn download_file(
         Ok(None) => Err(Error::from_status(StatusCode::NOT_FOUND)),
         Err(_) => Err(Error::from_status(StatusCode::INTERNAL_SERVER_ERROR)),
     }
+}
+
+
+
+#[derive(Deserialize)]
+pub struct BatchQuery {
+    ids: Option<String>,
+}
+
+// This endpoint downloads several files in one request, packed into a single tar archive.
+//
+// Arguments: takes a request, an optional comma separated list of file ids and a mongodb collection
+// Returns: a response with a tar archive of the files
+//
+// We use the get_documents_by_ids function to get the files of the user from the mongodb.
+// If no ids are given, all the files of the user are included.
+// Each file is added to the archive under its id only, so files with the same name don't clash,
+// and an uploaded filename (which could contain "..") never ends up in an archive path.
+// The client gets the filenames from the /files listing.
+// The content type is set to application/x-tar.
+
+// If an id is invalid or the archive can't be built, we return a 500 Internal Server Error
+
+#[poem_grants::protect("user")]
+#[handler]
+pub async fn download_files_batch(
+    req: &Request,
+    Query(query): Query<BatchQuery>,
+    db: Data<&Arc<Collection<DocumentEntry>>>,
+) -> poem::Result<Response, Error> {
+    let user = extract_user(req)?;
+    let ids: Vec<String> = query.ids
+        .map(|ids| ids.split(',').filter(|id| !id.is_empty()).map(ToString::to_string).collect())
+        .unwrap_or_default();
+
+    let documents = get_documents_by_ids(&**db, &user.username, &ids)
+        .await
+        .map_err(|_| Error::from_status(StatusCode::INTERNAL_SERVER_ERROR))?;
+
+    let mut archive = tar::Builder::new(Vec::new());
+    for doc in documents {
+        if let Some(id) = doc.id {
+            let mut header = tar::Header::new_gnu();
+            header.set_size(doc.content.bytes.len() as u64);
+            header.set_mode(0o644);
+            archive
+                .append_data(&mut header, id.to_hex(), doc.content.bytes.as_slice())
+                .map_err(|_| Error::from_status(StatusCode::INTERNAL_SERVER_ERROR))?;
+        }
+    }
+    let bytes = archive
+        .into_inner()
+        .map_err(|_| Error::from_status(StatusCode::INTERNAL_SERVER_ERROR))?;
+
+    let mut response = bytes.into_response();
+    response.headers_mut().insert(
+        "Content-Type",
+        HeaderValue::from_static("application/x-tar"),
+    );
+
+    Ok(response)
 }
\ No newline at end of file
@@ -84,4 +84,21 @@ pub async fn get_documents_for_user(
     }
 
     Ok(files)
+}
+
+pub async fn get_documents_by_ids(
+    collection: &Collection<DocumentEntry>,
+    username: &str,
+    ids: &[String],
+) -> Result<Vec<DocumentEntry>, Error> {
+    let mut filter = doc! { "user": username };
+    if !ids.is_empty() {
+        let obj_ids = ids.iter()
+            .map(|id| ObjectId::parse_str(id))
+            .collect::<Result<Vec<_>, _>>()
+            .map_err(|_| Error::from(std::io::Error::new(std::io::ErrorKind::InvalidInput, "Invalid ObjectId")))?;
+        filter.insert("_id", doc! { "$in": obj_ids });
+    }
+    let cursor = collection.find(filter).await?;
+    cursor.try_collect().await
 }
\ No newline at end of file
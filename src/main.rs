@@ -8,7 +8,7 @@ use api_handlers::user_handlers::*;
 use api_handlers::file_handlers::*;
 use auth::middleware::JwtMiddleware;
 use poem::{
-    get, post, listener::TcpListener, Route, Server,
+    get, post, listener::TcpListener, middleware::Compression, Route, Server,
     EndpointExt,
     Result,
 };
@@ -44,8 +44,9 @@ async fn main() -> Result<(), std::io::Error> {
         )
         .at("/login", post(api_handlers::user_handlers::login))
         .at("/upload", post(upload_file))
-        .at("/download_file/:filename", get(download_file))
+        .at("/download_file/:filename", get(download_file).with(Compression::new()))
         .at("/files", get(get_files))
+        .at("/files/batch", get(download_files_batch).with(Compression::new()))
         .at("/upload_image", post(upload_image))
         .at("/download_image/:imagename", get(download_image) )
         .with(JwtMiddleware)